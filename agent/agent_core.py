@@ -22,6 +22,15 @@ def parse_tool_call(call_string: str) -> Tuple[str, dict]:
         print(f"無法解析工具呼叫 '{call_string}': {e}")
         return None, {}
 
+def _predict_next_intent(step: str) -> str:
+    """根據計畫中的下一個步驟推測它將要尋找的元素意圖，無法推測時回傳 None。"""
+    tool_name, tool_args = parse_tool_call(step)
+    if tool_name == 'click_element':
+        return tool_args.get('intent')
+    if tool_name == 'perform_search':
+        return tool_args.get('search_box_intent', '搜尋框')
+    return None
+
 def run_agent_task_internal(socketio, api_key: str, user_task: str, attempt=1):
     if attempt > 3:
         socketio.emit('update_log', {'data': '❌ **已達最大重試次數，任務中止。**'})
@@ -111,9 +120,15 @@ def run_agent_task_internal(socketio, api_key: str, user_task: str, attempt=1):
                     socketio.emit('update_log', {'data': f'⚠️ **操作失敗，意圖「{failed_intent}」。正在檢查瀏覽器狀態...**'})
 
                     if not browser_tools.is_browser_alive():
-                        socketio.emit('update_log', {'data': '🚨 **偵測到瀏覽器已無回應或已關閉！**'})
-                        socketio.emit('update_log', {'data': '🔄 **正在嘗試重置瀏覽器並從頭重新執行任務...**'})
-                        browser_tools.driver = None
+                        # 只有整個瀏覽器 session 失效時才重置共用的瀏覽器，否則只重置本任務的分頁，不影響其他任務
+                        if browser_tools.is_session_alive():
+                            socketio.emit('update_log', {'data': '🚨 **偵測到目前分頁已無回應！**'})
+                            socketio.emit('update_log', {'data': '🔄 **正在重置此任務的分頁並從頭重新執行任務...**'})
+                            browser_tools.reset_tab()
+                        else:
+                            socketio.emit('update_log', {'data': '🚨 **偵測到瀏覽器已無回應或已關閉！**'})
+                            socketio.emit('update_log', {'data': '🔄 **正在嘗試重置瀏覽器並從頭重新執行任務...**'})
+                            browser_tools.reset_browser()
                         run_agent_task_internal(socketio, api_key, user_task, attempt + 1)
                         return
 
@@ -158,8 +173,7 @@ def run_agent_task_internal(socketio, api_key: str, user_task: str, attempt=1):
                         if add_result:
                             socketio.emit('update_log', {'data': f'✍️ **知識庫已成功擴增意圖「{failed_intent}」！準備重新規劃與執行任務...**'})
                             
-                            browser_tools.driver.quit()
-                            browser_tools.driver = None
+                            browser_tools.reset_tab()
                             run_agent_task_internal(socketio, api_key, user_task, attempt + 1)
                             return
                         else:
@@ -178,8 +192,7 @@ def run_agent_task_internal(socketio, api_key: str, user_task: str, attempt=1):
                         else:
                             socketio.emit('update_log', {'data': '🤔 **深度學習未發現新知識。將再次嘗試重新執行任務...**'})
 
-                        browser_tools.driver.quit()
-                        browser_tools.driver = None
+                        browser_tools.reset_tab()
                         run_agent_task_internal(socketio, api_key, user_task, attempt + 1)
                         return
 
@@ -188,6 +201,10 @@ def run_agent_task_internal(socketio, api_key: str, user_task: str, attempt=1):
 
             socketio.emit('update_log', {'data': f'✔️ <strong>步驟 {i+1} 結果:</strong> {result}'})
 
+            # 頁面已在本步驟結束後穩定，趁等待期間在背景預先解析下一步的目標元素
+            if i + 1 < len(action_plan):
+                browser_tools.speculate_element(_predict_next_intent(action_plan[i + 1]))
+
         except Exception as e:
             socketio.emit('update_log', {'data': f'❌ <strong>步驟 {i+1} 執行失敗:</strong> {e}'})
             break
@@ -198,10 +215,17 @@ def run_agent_task(socketio, api_key: str, user_task: str):
     try:
         genai.configure(api_key=api_key)
         browser_tools.set_socketio(socketio)
+        # 每個任務在共用的瀏覽器中使用自己的分頁，結束後分頁保持開啟以供檢視 (只保留最近幾個)
+        browser_tools.open_tab()
         run_agent_task_internal(socketio, api_key, user_task)
+
+        stats = browser_tools.get_speculation_stats()
+        if stats['hits'] + stats['misses']:
+            socketio.emit('update_log', {'data': f'🔮 **預先解析命中率：** {stats["hits"]}/{stats["hits"] + stats["misses"]} ({stats["hit_rate"]:.0%})'})
     except Exception as e:
         socketio.emit('update_log', {'data': f'❌ **發生嚴重錯誤: {e}**'})
         import traceback
         traceback.print_exc()
     finally:
+        browser_tools.finish_tab()
         socketio.emit('task_complete', {'data': '✅ **任務流程結束。瀏覽器將保持開啟以供檢視。**'})
\ No newline at end of file
@@ -1,7 +1,7 @@
 # agent/browser_tools.py (新增頁面儲存功能)
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, NoSuchWindowException, TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -9,15 +9,316 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
-import time, os
+import time, os, threading, uuid
 from . import knowledge_base
 from urllib.parse import urlparse
 from datetime import datetime
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 driver = None
 socketio_instance = None
 
-_LAST_SUCCESSFUL_SELECTORS = {}
+# --- vvv 多分頁執行環境 vvv ---
+# 同一個 Chrome 以分頁服務多個任務：每個任務 (或獨立的計畫分支) 擁有自己的分頁與選擇器快取。
+# 所有 WebDriver 指令都必須透過 _use_tab() 取得此鎖並切換到所屬分頁後才能執行。
+_driver_lock = threading.RLock()
+_active_handle = None
+_tab_contexts: Dict[str, 'TabContext'] = {}
+_thread_binding = threading.local()
+# 任務結束後保留供檢視的分頁數量上限；超過時關閉最舊的已結束分頁，避免 renderer 無限增加
+_MAX_FINISHED_TABS = 2
+_finished_tabs = deque()
+
+class TabContext:
+    """單一任務專屬的分頁執行環境：window handle 與「域名 -> 意圖 -> 最後成功選擇器」快取。"""
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.window_handle = None
+        self.selector_cache: Dict[str, Dict[str, str]] = {}
+        # 預先解析 (speculation) 的進行中結果與命中統計，見 speculate_element()
+        self.speculation: Optional[dict] = None
+        self.speculation_stats: Dict[str, int] = {'hits': 0, 'misses': 0}
+
+def open_tab(task_id: str = None) -> str:
+    """
+    為目前的執行緒綁定一個分頁執行環境並回傳其 task_id。
+    實際的瀏覽器分頁會在第一次執行 WebDriver 指令時才開啟。
+    """
+    task_id = task_id or uuid.uuid4().hex[:8]
+    with _driver_lock:
+        if task_id not in _tab_contexts:
+            _tab_contexts[task_id] = TabContext(task_id)
+    _thread_binding.task_id = task_id
+    return task_id
+
+def _current_context() -> TabContext:
+    """取得目前執行緒所屬的分頁執行環境；尚未綁定的執行緒共用 'default' 分頁。"""
+    task_id = getattr(_thread_binding, 'task_id', 'default')
+    with _driver_lock:
+        if task_id not in _tab_contexts:
+            _tab_contexts[task_id] = TabContext(task_id)
+        return _tab_contexts[task_id]
+
+def _allocate_window(context: TabContext):
+    """(需持有 _driver_lock) 為分頁執行環境分配 window handle：優先使用尚未被認領的視窗，否則開新分頁。"""
+    global _active_handle
+    claimed = {c.window_handle for c in _tab_contexts.values() if c is not context}
+    free_handles = [h for h in driver.window_handles if h not in claimed]
+    if free_handles:
+        context.window_handle = free_handles[0]
+        driver.switch_to.window(context.window_handle)
+    else:
+        driver.switch_to.new_window('tab')
+        context.window_handle = driver.current_window_handle
+    _active_handle = context.window_handle
+
+def _switch_to_context(context: TabContext, allocate: bool = True) -> bool:
+    """
+    (需持有 _driver_lock) 切換到分頁執行環境的視窗，只有在實際切換分頁時才會多送一次 switch_to 指令。
+    allocate=False 時不會為沒有視窗 (或視窗已被關閉) 的執行環境開啟新分頁，而是回傳 False。
+    """
+    global _active_handle
+    if context.window_handle is None:
+        if not allocate:
+            return False
+        _allocate_window(context)
+    elif _active_handle != context.window_handle:
+        try:
+            driver.switch_to.window(context.window_handle)
+            _active_handle = context.window_handle
+        except NoSuchWindowException:
+            # 分頁已被關閉 (例如使用者手動關閉)，重新分配一個
+            if not allocate:
+                return False
+            _allocate_window(context)
+    return True
+
+@contextmanager
+def _use_tab():
+    """
+    【分頁排程】取得 WebDriver 鎖並切換到目前任務的分頁，離開 with 區塊後才讓其他任務使用瀏覽器。
+    瀏覽器未啟動時 yield None。
+    """
+    with _driver_lock:
+        if driver is None:
+            yield None
+            return
+        _switch_to_context(_current_context())
+        yield driver
+
+def _wait_in_tab(timeout: float, condition):
+    """WebDriverWait 的分頁安全版本：每次輪詢時才短暫持有鎖，等待期間不會阻擋其他分頁。"""
+    def poll(_):
+        with _use_tab() as d:
+            return condition(d)
+    return WebDriverWait(driver, timeout).until(poll)
+
+def _close_window(context: TabContext):
+    """
+    (需持有 _driver_lock) 關閉分頁；只有當瀏覽器中僅剩的視窗正是這個分頁時，才直接結束整個瀏覽器。
+    分頁若已被手動關閉 (handle 失效)，只清除 handle，不影響其他任務的視窗。
+    """
+    global driver, _active_handle
+    if driver is None or context.window_handle is None:
+        context.window_handle = None
+        return
+    try:
+        handles = driver.window_handles
+        if context.window_handle not in handles:
+            pass
+        elif len(handles) <= 1:
+            driver.quit()
+            driver = None
+        else:
+            driver.switch_to.window(context.window_handle)
+            try:
+                driver.switch_to.alert.dismiss()  # 未處理的 alert 會阻擋關閉分頁
+            except Exception:
+                pass
+            driver.close()
+    except Exception:
+        pass
+    context.window_handle = None
+    _cancel_speculation(context)
+    _active_handle = None
+
+def reset_tab():
+    """關閉目前任務的分頁 (保留選擇器快取)，下一次導航時會開啟全新的分頁。"""
+    with _driver_lock:
+        _close_window(_current_context())
+
+def close_tab():
+    """關閉目前任務的分頁並移除其執行環境 (包含選擇器快取)。"""
+    with _driver_lock:
+        context = _current_context()
+        _close_window(context)
+        _tab_contexts.pop(context.task_id, None)
+    if hasattr(_thread_binding, 'task_id'):
+        del _thread_binding.task_id
+
+def finish_tab():
+    """
+    任務結束時呼叫：分頁保持開啟以供檢視，但只保留最近 _MAX_FINISHED_TABS 個已結束的分頁，
+    更舊的會被關閉並移除其執行環境。
+    """
+    with _driver_lock:
+        context = _current_context()
+        # 計畫中止或結束時可能仍有排隊中的預先解析，保留的分頁不應再佔用瀏覽器
+        _cancel_speculation(context)
+        if context.window_handle is None:
+            _tab_contexts.pop(context.task_id, None)
+        else:
+            _finished_tabs.append(context.task_id)
+        while len(_finished_tabs) > _MAX_FINISHED_TABS:
+            oldest = _tab_contexts.pop(_finished_tabs.popleft(), None)
+            if oldest is not None:
+                _close_window(oldest)
+    if hasattr(_thread_binding, 'task_id'):
+        del _thread_binding.task_id
+
+def is_session_alive() -> bool:
+    """以 session 層級 (不切換分頁) 檢查整個瀏覽器是否仍可回應；單一分頁卡住 (例如 alert) 不影響結果。"""
+    if driver is None:
+        return False
+    try:
+        with _driver_lock:
+            _ = driver.window_handles
+        return True
+    except Exception:
+        return False
+
+def reset_browser():
+    """瀏覽器已無回應時使用：捨棄整個 WebDriver，所有分頁執行環境會在下一次使用時重新分配分頁。"""
+    global driver, _active_handle
+    with _driver_lock:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        driver = None
+        _active_handle = None
+        # 已結束任務的分頁隨瀏覽器一起消失，不需要再保留它們的執行環境
+        while _finished_tabs:
+            _tab_contexts.pop(_finished_tabs.popleft(), None)
+        for context in _tab_contexts.values():
+            context.window_handle = None
+            _cancel_speculation(context)
+# --- ^^^ 多分頁執行環境結束 ^^^ ---
+
+# --- vvv 下一步元素的預先解析 (speculative resolution) vvv ---
+# 計畫在執行前就已確定，因此在目前步驟結束、頁面穩定後，即可在背景為下一步的意圖先找出可點擊的元素。
+# 下一步真正執行時只需確認網址與 DOM 沒有變動，就能直接使用這個元素，省下逐一嘗試選擇器的等待時間。
+_speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='speculate')
+# 下一步開始時若預先解析仍在進行中，最多等待的秒數
+_SPECULATION_WAIT = 2
+# 以元素總數作為輕量的 DOM 變動指標
+_DOM_SIGNATURE_SCRIPT = "return document.getElementsByTagName('*').length;"
+
+def _candidate_selectors(context: TabContext, intent: str, hostname: str) -> list:
+    """依照 _find_element_with_knowledge 的順序列出候選選擇器：先是該域名快取，再是知識庫。"""
+    candidates = []
+    cached_selector = context.selector_cache.get(hostname, {}).get(intent) if hostname else None
+    if cached_selector:
+        candidates.append(cached_selector)
+    candidates.extend(s for s in knowledge_base.get_selectors(intent) if s != cached_selector)
+    return candidates
+
+def _probe_in_context(context: TabContext, cancelled: threading.Event, probe):
+    """
+    在單次持有 _driver_lock 的期間內，確認預先解析仍然有效 (未被取消、分頁未關閉或重置) 後，
+    切換到該分頁並執行 probe(driver)。任何檢查失敗都回傳 None，且絕不為它開啟新分頁。
+    """
+    with _driver_lock:
+        if (driver is None or cancelled.is_set() or _tab_contexts.get(context.task_id) is not context
+                or not _switch_to_context(context, allocate=False)):
+            return None
+        return probe(driver)
+
+def _speculate(context: TabContext, intent: str, cancelled: threading.Event):
+    """【背景工作】在任務所屬的分頁中逐一探測候選選擇器 (不等待)，回傳第一個可點擊元素與當下的頁面狀態。"""
+    page_state = _probe_in_context(context, cancelled, lambda d: (d.current_url, d.execute_script(_DOM_SIGNATURE_SCRIPT)))
+    if page_state is None:
+        return None
+    url, dom_signature = page_state
+
+    for selector in _candidate_selectors(context, intent, urlparse(url).hostname):
+        if cancelled.is_set():
+            return None
+        try:
+            element = _probe_in_context(context, cancelled, EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
+        except Exception:
+            element = None
+        if element:
+            return {'selector': selector, 'element': element, 'url': url, 'dom_signature': dom_signature}
+    return None
+
+def _cancel_speculation(context: TabContext):
+    """丟棄分頁執行環境中進行中的預先解析：尚未開始的工作直接取消，已開始的會在下一次探測前停止。"""
+    speculation, context.speculation = context.speculation, None
+    if speculation is not None:
+        speculation['cancelled'].set()
+        speculation['future'].cancel()
+    return speculation
+
+def speculate_element(intent: str):
+    """在背景為目前任務的下一個意圖預先解析元素；結果由下一次 _find_element_with_knowledge(intent) 取用。"""
+    if driver is None or not intent:
+        return
+    context = _current_context()
+    _cancel_speculation(context)
+    cancelled = threading.Event()
+    context.speculation = {
+        'intent': intent,
+        'cancelled': cancelled,
+        'future': _speculation_executor.submit(_speculate, context, intent, cancelled),
+    }
+
+def _take_speculation(context: TabContext, intent: str):
+    """
+    取出並驗證預先解析的結果。只有在意圖相同、網址與 DOM 指標未變動、且元素仍可點擊時才採用，
+    否則丟棄並記為未命中。逾時或不符的預先解析會被取消，不再與正常查找競爭瀏覽器。
+    """
+    speculation = context.speculation
+    if speculation is None:
+        return None
+
+    result = None
+    if speculation['intent'] == intent:
+        try:
+            result = speculation['future'].result(timeout=_SPECULATION_WAIT)
+        except Exception:
+            result = None
+    _cancel_speculation(context)
+
+    element = None
+    if result:
+        try:
+            with _use_tab() as d:
+                unchanged = (d.current_url == result['url']
+                             and d.execute_script(_DOM_SIGNATURE_SCRIPT) == result['dom_signature'])
+                element = EC.element_to_be_clickable(result['element'])(d) if unchanged else None
+        except Exception:
+            element = None  # 元素已失效 (stale) 或頁面已切換
+
+    if not element:
+        context.speculation_stats['misses'] += 1
+        return None
+
+    context.speculation_stats['hits'] += 1
+    _log(f"🔮 **預先解析命中：** 意圖 '{intent}' 直接使用策略 `{result['selector']}`")
+    return result['selector'], element
+
+def get_speculation_stats() -> Dict[str, int]:
+    """回傳目前任務的預先解析統計：hits、misses 與 hit_rate。"""
+    stats = dict(_current_context().speculation_stats)
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+# --- ^^^ 預先解析結束 ^^^ ---
 
 def set_socketio(sio):
     global socketio_instance
@@ -36,7 +337,9 @@ def save_full_page_content() -> str:
         _log("❌ **錯誤：無法儲存頁面，瀏覽器未啟動。**")
         return None
     try:
-        page_html = driver.page_source
+        with _use_tab() as d:
+            page_html = d.page_source
+            current_url = d.current_url
         
         # 建立儲存資料夾 (如果不存在)
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -44,7 +347,7 @@ def save_full_page_content() -> str:
         os.makedirs(save_dir, exist_ok=True)
         
         # 產生檔案名稱
-        hostname = urlparse(driver.current_url).hostname or "local_page"
+        hostname = urlparse(current_url).hostname or "local_page"
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{hostname}_{timestamp}.html"
         file_path = os.path.join(save_dir, filename)
@@ -63,48 +366,67 @@ def save_full_page_content() -> str:
 
 # ... (檔案中其他的函式 _find_element_with_knowledge, verify_selector 等維持不變) ...
 def is_browser_alive() -> bool:
+    """檢查目前任務的分頁是否仍可回應；分頁已被關閉時回傳 False，而不會默默開啟新的空白分頁。"""
     if driver is None:
         return False
     try:
-        _ = driver.title
+        with _driver_lock:
+            if not _switch_to_context(_current_context(), allocate=False):
+                return False
+            _ = driver.title
         return True
     except Exception:
         return False
 
+def _scroll_into_view(element):
+    with _use_tab() as d:
+        d.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+
 def _find_element_with_knowledge(intent: str):
     """
     【效能優化版】
-    1. 優先嘗試域名快取中最後成功的選擇器。
+    0. 若上一步結束後已在背景預先解析出此意圖的元素，且頁面未變動，直接使用。
+    1. 優先嘗試域名快取中最後成功的選擇器 (快取屬於目前任務的分頁)。
     2. 如果快取失敗或不存在，才遍歷完整知識庫。
     3. 遍歷時使用較短的超時時間，以提升速度。
     4. 成功後，將結果更新回快取。
     """
     if not driver: return None
+    context = _current_context()
+    selector_cache = context.selector_cache
+    speculated = _take_speculation(context, intent)
 
     # 1. 獲取當前域名
     try:
-        current_url = driver.current_url
+        with _use_tab() as d:
+            current_url = d.current_url
         hostname = urlparse(current_url).hostname
     except Exception:
         hostname = None # 如果獲取失敗，則不使用快取
 
+    # 0. 使用預先解析的結果
+    if speculated:
+        selector, element = speculated
+        _scroll_into_view(element)
+        if hostname:
+            selector_cache.setdefault(hostname, {})[intent] = selector
+        return element
+
     # 2. 優先嘗試快取
-    if hostname and hostname in _LAST_SUCCESSFUL_SELECTORS and intent in _LAST_SUCCESSFUL_SELECTORS[hostname]:
-        cached_selector = _LAST_SUCCESSFUL_SELECTORS[hostname][intent]
+    if hostname and hostname in selector_cache and intent in selector_cache[hostname]:
+        cached_selector = selector_cache[hostname][intent]
         _log(f"🧠 **快取命中：** 正在為意圖 '{intent}' 優先嘗試策略 `{cached_selector}`")
         try:
             # 使用一個較短的超時來驗證快取
-            element = WebDriverWait(driver, 2).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, cached_selector))
-            )
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+            element = _wait_in_tab(2, EC.element_to_be_clickable((By.CSS_SELECTOR, cached_selector)))
+            _scroll_into_view(element)
             time.sleep(0.5)
             _log("✅ **快取策略成功！**")
             return element
         except Exception:
             _log(f"⚠️ **快取策略 `{cached_selector}` 已失效。**")
             # 從快取中移除失效的策略
-            del _LAST_SUCCESSFUL_SELECTORS[hostname][intent]
+            del selector_cache[hostname][intent]
 
     # 3. 如果快取失敗或不存在，遍歷完整知識庫
     selectors = knowledge_base.get_selectors(intent)
@@ -116,17 +438,15 @@ def _find_element_with_knowledge(intent: str):
     for selector in selectors:
         try:
             # 【參數調整】將超時從 5 秒縮短為 2 秒，大幅減少每次嘗試的延遲
-            element = WebDriverWait(driver, 2).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-            )
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+            element = _wait_in_tab(2, EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
+            _scroll_into_view(element)
             time.sleep(0.5)
 
             # 4. 成功後，更新快取
             if hostname:
-                if hostname not in _LAST_SUCCESSFUL_SELECTORS:
-                    _LAST_SUCCESSFUL_SELECTORS[hostname] = {}
-                _LAST_SUCCESSFUL_SELECTORS[hostname][intent] = selector
+                if hostname not in selector_cache:
+                    selector_cache[hostname] = {}
+                selector_cache[hostname][intent] = selector
                 _log(f"✍️ **快取已更新：** 意圖 '{intent}' -> `{selector}`")
             
             return element
@@ -138,7 +458,7 @@ def _find_element_with_knowledge(intent: str):
 def verify_selector(selector: str) -> bool:
     if driver is None: return False
     try:
-        WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        _wait_in_tab(3, EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
         return True
     except TimeoutException:
         return False
@@ -150,7 +470,8 @@ def perform_search(text: str, search_box_intent: str = "搜尋框", search_butto
     if driver is None: return "錯誤：瀏覽器未啟動。"
     
     _log(f"🔍 開始執行搜尋: '{text}'")
-    initial_url = driver.current_url
+    with _use_tab() as d:
+        initial_url = d.current_url
     
     search_box = _find_element_with_knowledge(search_box_intent)
     if not search_box:
@@ -158,8 +479,9 @@ def perform_search(text: str, search_box_intent: str = "搜尋框", search_butto
         return f"操作失敗：找不到意圖為 '{search_box_intent}' 的輸入框。"
     
     try:
-        search_box.clear()
-        search_box.send_keys(text)
+        with _use_tab():
+            search_box.clear()
+            search_box.send_keys(text)
         _log(f"✅ 已在 '{search_box_intent}' 中輸入文字: '{text}'")
     except Exception as e:
         return f"在 '{search_box_intent}' 輸入文字時失敗: {e}"
@@ -167,23 +489,27 @@ def perform_search(text: str, search_box_intent: str = "搜尋框", search_butto
     search_button = _find_element_with_knowledge(search_button_intent)
     if search_button:
         try:
-            driver.execute_script("arguments[0].click();", search_button)
+            with _use_tab() as d:
+                d.execute_script("arguments[0].click();", search_button)
             _log(f"✅ 已成功點擊 '{search_button_intent}'。")
         except Exception as e:
             _log(f"⚠️ 點擊 '{search_button_intent}' 失敗: {e}。嘗試使用 ENTER。")
             try:
-                search_box.send_keys(Keys.RETURN)
+                with _use_tab():
+                    search_box.send_keys(Keys.RETURN)
             except Exception as e_enter:
                  return f"操作失敗：點擊按鈕及按下 ENTER 均失敗。"
     else:
         _log(f"⚠️ 未找到 '{search_button_intent}'，直接在搜尋框上按下 ENTER。")
         try:
-            search_box.send_keys(Keys.RETURN)
+            with _use_tab():
+                search_box.send_keys(Keys.RETURN)
         except Exception as e:
             return f"在搜尋框上按下 ENTER 鍵時失敗: {e}"
 
     time.sleep(3)
-    final_url = driver.current_url
+    with _use_tab() as d:
+        final_url = d.current_url
     if initial_url == final_url:
         # 【修正】確保使用全形冒號
         return f"操作失敗：搜尋動作已執行，但頁面沒有跳轉。"
@@ -199,7 +525,8 @@ def click_element(intent: str) -> str:
         # 【修正】確保使用全形冒號
         return f"操作失敗：找不到意圖為 '{intent}' 的可點擊元素。"
     try:
-        driver.execute_script("arguments[0].click();", element_to_click)
+        with _use_tab() as d:
+            d.execute_script("arguments[0].click();", element_to_click)
         _log(f"✅ 已成功點擊意圖為 '{intent}' 的元素。")
         time.sleep(3)
         return f"已成功點擊 '{intent}'。"
@@ -208,30 +535,36 @@ def click_element(intent: str) -> str:
         return f"點擊意圖為 '{intent}' 的元素時失敗: {e}"
 
 def navigate_to_url(url: str) -> str:
-    global driver
-    if driver is None:
-        try:
-            options = Options(); options.add_argument("--start-maximized")
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            service = Service(ChromeDriverManager().install()); driver = webdriver.Chrome(service=service, options=options)
-        except Exception as e: return f"瀏覽器初始化失敗: {e}"
+    global driver, _active_handle
+    with _driver_lock:
+        if driver is None:
+            try:
+                options = Options(); options.add_argument("--start-maximized")
+                options.add_experimental_option("excludeSwitches", ["enable-automation"])
+                service = Service(ChromeDriverManager().install()); driver = webdriver.Chrome(service=service, options=options)
+                _active_handle = None
+            except Exception as e: return f"瀏覽器初始化失敗: {e}"
     
     try:
-        driver.get(url); time.sleep(3)
+        with _use_tab() as d:
+            d.get(url)
+        time.sleep(3)
         return f"已成功導航至: {url}"
     except Exception as e: return f"導航失敗: {e}"
 
 def get_page_content() -> str:
     if driver is None: return "錯誤：瀏覽器未啟動。"
     try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        return driver.page_source
+        _wait_in_tab(10, EC.presence_of_element_located((By.TAG_NAME, "body")))
+        with _use_tab() as d:
+            return d.page_source
     except Exception as e: return f"獲取頁面內容失敗: {e}"
 
 def get_current_url() -> str:
     if driver is None: return "錯誤：瀏覽器未啟動。"
     try:
-        return driver.current_url
+        with _use_tab() as d:
+            return d.current_url
     except Exception as e:
         return f"獲取當前網址失敗: {e}"
 
@@ -239,6 +572,7 @@ def take_screenshot(filename: str = "screenshot.png") -> str:
     if driver is None: return "錯誤：瀏覽器未啟動。"
     try:
         save_path = os.path.join(os.getcwd(), filename)
-        driver.save_screenshot(save_path)
+        with _use_tab() as d:
+            d.save_screenshot(save_path)
         return f"已截圖至 {save_path}"
     except Exception as e: return f"截圖失敗: {e}"
\ No newline at end of file
@@ -93,4 +93,59 @@ def get_all_intents() -> List[str]:
     讀取知識庫，並回傳所有意圖 (titles) 的列表。
     """
     kb = _load_knowledge_base_from_json(force_reload=True) # 強制重讀以獲取最新列表
-    return list(kb.keys())
\ No newline at end of file
+    return list(kb.keys())
+
+def apply_selector_changes(pruned: Dict[str, List[str]], demoted: Dict[str, List[str]]) -> int:
+    """
+    【批次維護】一次性移除 (prune) 或降級 (demote) 多個選擇器，並安全地寫回 JSON 檔案。
+    降級的選擇器會被移到該意圖列表的末端 (保持彼此的相對順序)，
+    讓 _find_element_with_knowledge 優先嘗試仍然健康的策略。
+    不會刪除整個意圖：若某個意圖的所有選擇器都被要求移除，會保留第一個被要求移除的選擇器 (改為降級)。
+    回傳實際變動的選擇器數量。
+    """
+    global _KNOWLEDGE_BASE
+
+    with _db_lock:
+        try:
+            json_path = _get_json_path()
+            # 與 add_selector 相同：直接讀取檔案最新內容，避免覆蓋分析期間新增的選擇器
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    kb_data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                kb_data = {}
+
+            changed_count = 0
+            for intent in set(pruned) | set(demoted):
+                selectors = kb_data.get(intent)
+                if not selectors:
+                    continue
+
+                to_prune = set(pruned.get(intent, []))
+                to_demote = set(demoted.get(intent, []))
+                if to_prune.issuperset(selectors):
+                    to_prune.discard(pruned[intent][0])
+                    to_demote.add(pruned[intent][0])
+                to_demote -= to_prune
+                kept = [s for s in selectors if s not in to_prune and s not in to_demote]
+                tail = [s for s in selectors if s in to_demote]
+                new_selectors = kept + tail
+
+                changed_count += len(selectors) - len(new_selectors)
+                changed_count += sum(1 for s in tail if selectors.index(s) < len(kept))
+
+                kb_data[intent] = new_selectors
+
+            if changed_count == 0:
+                return 0
+
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(kb_data, f, indent=2, ensure_ascii=False)
+
+            _KNOWLEDGE_BASE = None
+            print(f"Knowledge base maintenance applied: {changed_count} selector(s) pruned or demoted.")
+            return changed_count
+
+        except Exception as e:
+            print(f"An unexpected error occurred while applying knowledge base maintenance: {e}")
+            return 0
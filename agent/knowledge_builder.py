@@ -3,8 +3,20 @@
 import google.generativeai as genai
 from . import browser_tools
 from . import knowledge_base
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
 import json
 
+# 單一區塊送給學徒的 HTML 上限 (字元數)，過大的區塊會再依子元素切分
+_MAX_CHUNK_CHARS = 30000
+# 同時進行的學徒分析請求上限
+_MAX_ANALYSIS_WORKERS = 4
+# 兄弟元素重複出現達此次數才視為列表，收斂為單一範例
+_MIN_REPEATED_ITEMS = 3
+# 這些 role 的子項目是各自獨立的導覽目的地，不視為可收斂的重複列表
+_NAVIGATION_ROLES = ('navigation', 'menubar', 'menu', 'tablist')
+
 def _consolidate_knowledge(socketio, new_findings: dict) -> dict:
     """
     【AI 導師】
@@ -55,49 +67,223 @@ def _consolidate_knowledge(socketio, new_findings: dict) -> dict:
         return new_findings
 
 
-def _analyze_and_update(socketio, file_path: str):
+def _describe_ancestors(tag) -> str:
+    """輔助函式：產生元素的祖先路徑描述 (例如 `body > div#app > main.content`)，讓學徒在區塊被切出後仍知道它在頁面中的位置。"""
+    path = []
+    for parent in reversed(list(tag.parents)):
+        if parent.name in (None, '[document]', 'html'):
+            continue
+        description = parent.name
+        if parent.get('id'):
+            description += f"#{parent['id']}"
+        elif parent.get('class'):
+            description += '.' + '.'.join(parent['class'][:2])
+        path.append(description)
+    return ' > '.join(path)
+
+def _collapse_repeated_items(root) -> set:
+    """
+    將重複的列表項目 (同一父元素下 tag 與 class 完全相同、且出現至少 _MIN_REPEATED_ITEMS 次的兄弟元素) 收斂為一個範例。
+    商品列表、新聞卡片等結構只需要一個樣本就能推導出選擇器。
+    導覽選單中的項目雖然結構相同，但各自代表不同的目的地 (例如「國際」與「商業」分類)，因此不收斂。
+    回傳保留下來的範例元素 id() 集合。
+    """
+    exemplars = set()
+    for parent in root.find_all(True):
+        if parent.decomposed or _is_navigation_menu(parent):
+            continue
+        children = parent.find_all(True, recursive=False)
+        signatures = [(child.name, tuple(child.get('class') or ())) for child in children]
+        seen_signatures = set()
+        for child, signature in zip(children, signatures):
+            if signatures.count(signature) < _MIN_REPEATED_ITEMS:
+                continue
+            if signature in seen_signatures:
+                child.decompose()
+            else:
+                seen_signatures.add(signature)
+                exemplars.add(id(child))
+    return exemplars
+
+def _is_navigation_menu(tag) -> bool:
+    """輔助函式：判斷元素是否位於導覽選單 (nav、navigation / menubar / tablist 等 role) 之中。"""
+    for candidate in [tag, *tag.parents]:
+        if candidate.name == 'nav' or candidate.get('role') in _NAVIGATION_ROLES:
+            return True
+    return False
+
+def _split_oversized_html(tag) -> List[str]:
+    """將超過 _MAX_CHUNK_CHARS 的元素依其直接子元素切分；單一子元素仍過大時遞迴切分，最後才直接截斷。"""
+    tag_html = str(tag)
+    if len(tag_html) <= _MAX_CHUNK_CHARS:
+        return [tag_html]
+
+    children = tag.find_all(True, recursive=False)
+    if not children:
+        return [tag_html[:_MAX_CHUNK_CHARS]]
+
+    chunks, buffer = [], ''
+    for child in children:
+        child_html = str(child)
+        if len(child_html) > _MAX_CHUNK_CHARS:
+            if buffer:
+                chunks.append(buffer)
+                buffer = ''
+            chunks.extend(_split_oversized_html(child))
+        elif len(buffer) + len(child_html) > _MAX_CHUNK_CHARS:
+            chunks.append(buffer)
+            buffer = child_html
+        else:
+            buffer += child_html
+    if buffer:
+        chunks.append(buffer)
+    return chunks
+
+def _pack_chunks(region_name: str, chunks: List[str]) -> List[Tuple[str, str]]:
+    """將同名區塊的小片段合併為不超過 _MAX_CHUNK_CHARS 的共用段落，讓學徒呼叫次數維持在有限範圍內。"""
+    packed, buffer = [], ''
+    for chunk_html in chunks:
+        if buffer and len(buffer) + len(chunk_html) > _MAX_CHUNK_CHARS:
+            packed.append(buffer)
+            buffer = ''
+        buffer += chunk_html + '\n'
+    if buffer:
+        packed.append(buffer)
+
+    if len(packed) == 1:
+        return [(region_name, packed[0])]
+    return [(f"{region_name} (第 {i + 1}/{len(packed)} 段)", chunk_html) for i, chunk_html in enumerate(packed)]
+
+def _split_page_into_regions(full_page_html: str) -> List[Tuple[str, str]]:
+    """
+    【區塊切分】將整頁 HTML 切分為語意完整的區塊，供學徒平行分析。
+    1. 移除 script / style 等與互動元素無關的內容。
+    2. 先在整份文件中將重複的列表項目收斂為一個範例，再切分區塊。
+    3. 依序切出 表單/搜尋、頁首/導覽、頁尾、主要內容，剩餘部分歸為「其他內容」。
+       位於主要內容、article 或列表項目之中的 form / header / nav 屬於該內容的一部分，不會被單獨切出。
+    4. 過大的區塊依子元素切分；同名的小區塊合併成不超過 _MAX_CHUNK_CHARS 的段落，確保呼叫次數有上限。
+    """
+    soup = BeautifulSoup(full_page_html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'svg', 'template', 'link', 'meta', 'iframe']):
+        tag.decompose()
+    exemplars = _collapse_repeated_items(soup)
+
+    def is_nested_in_content(tag) -> bool:
+        for parent in tag.parents:
+            if (parent.name in ('main', 'article') or parent.get('role') in ('main', 'article')
+                    or id(parent) in exemplars):
+                return True
+        return id(tag) in exemplars
+
+    region_selectors = [
+        ('表單與搜尋區', "form, [role='search']"),
+        ('頁首與導覽列', "header, nav, [role='banner'], [role='navigation']"),
+        ('頁尾', "footer, [role='contentinfo']"),
+        ('主要內容', "main, [role='main']"),
+    ]
+
+    chunks_by_region = {}
+    for region_name, selector in region_selectors:
+        for tag in soup.select(selector):
+            if not any(parent is soup for parent in tag.parents):
+                continue  # 已隨著先前切出的區塊一併被移除
+            if region_name != '主要內容' and is_nested_in_content(tag):
+                continue
+            location = _describe_ancestors(tag)
+            tag.extract()
+            for chunk_html in _split_oversized_html(tag):
+                if location:
+                    chunk_html = f"<!-- 所在位置: {location} -->\n{chunk_html}"
+                chunks_by_region.setdefault(region_name, []).append(chunk_html)
+
+    remaining = soup.body or soup
+    if remaining.find(['a', 'button', 'input', 'select', 'textarea']) or remaining.find(attrs={'role': True}):
+        chunks_by_region.setdefault('其他內容', []).extend(_split_oversized_html(remaining))
+
+    regions = []
+    for region_name, chunks in chunks_by_region.items():
+        regions.extend(_pack_chunks(region_name, chunks))
+    return regions
+
+def _analyze_region(socketio, region_name: str, region_html: str) -> dict:
+    """【AI 學徒】分析單一頁面區塊，回傳該區塊的初步發現。失敗時回傳空字典，不影響其他區塊。"""
     analysis_model = genai.GenerativeModel('gemini-2.5-pro')
 
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            full_page_html = f.read()
-    except Exception as e:
-        socketio.emit('update_log', {'data': f'❌ **錯誤：無法讀取已儲存的頁面快照檔案：** {e}'})
-        return 0
-    
     # --- vvv 注入「穩定選擇器」思想的 Prompt vvv ---
     analysis_prompt = (
         "你是一位頂尖的前端工程師，專門為自動化測試撰寫最穩定、最可靠的 CSS 選擇器。\n\n"
         "## 你的核心原則:\n"
         "1.  **穩定性優先**: 尋找那些最不可能改變的屬性來定位元素。優先順序是：獨特的 `id` > 描述功能的 `role` 或 `aria-label` > 語意清晰的 `class` 名稱 > 穩定的父子結構關係。\n"
         "2.  **避免脆弱性**: 「絕對不要」使用由程式碼自動生成的、沒有語意、看起來像亂碼的 class 名稱 (例如: `jss31`, `css-1dbjc4n`, `ekqMKf`)。這些是導致不穩定的主要原因。\n"
-        "3.  **人類可讀**: 盡可能創造人類可讀的意圖名稱，例如從 `aria-label` 或元素的文字內容中提煉。\n\n"
+        "3.  **人類可讀**: 盡可能創造人類可讀的意圖名稱，例如從 `aria-label` 或元素的文字內容中提煉。\n"
+        "4.  **列表範例**: 重複的列表項目只保留了一個範例，請為它撰寫能涵蓋所有同類項目的通用選擇器。\n\n"
         "## 你的任務:\n"
-        "全面分析我提供的 HTML，找出所有具備明確意圖的互動元素，並為它們創造一個初步的意圖名稱和一個極度穩定的 CSS 選擇器。\n\n"
+        f"以下 HTML 是完整頁面中的「{region_name}」區塊 (開頭的註解標示了它在頁面中的位置)。"
+        "全面分析這個區塊，找出所有具備明確意圖的互動元素，並為它們創造一個初步的意圖名稱和一個極度穩定的 CSS 選擇器。"
+        "選擇器必須能在「完整頁面」上使用。\n\n"
         "## 輸出格式要求 (極度重要):\n"
         "回傳一個合法的 JSON 物件。鍵(key)是你初步創造的意圖名稱，值(value)是只包含「一個」你認為最穩定的 CSS 選擇器的列表。\n"
+        "如果這個區塊沒有任何互動元素，請回傳 `{}`。\n"
         "**嚴格禁止**回傳任何 Markdown 標籤或額外解釋。\n\n"
-        f"## 以下是待分析的完整 HTML:\n{full_page_html}\n\n"
+        f"## 以下是待分析的 HTML 區塊:\n{region_html}\n\n"
         "請開始分析，並回傳你所有發現的 JSON 物件："
     )
     # --- ^^^ Prompt 修改結束 ^^^ ---
-    
-    socketio.emit('update_log', {'data': '🤖 **AI 學徒啟動：正在分析完整頁面，尋找穩定元素特徵...**'})
-    response = analysis_model.generate_content(analysis_prompt)
-    
+
     try:
+        response = analysis_model.generate_content(analysis_prompt)
         raw_text = response.text
         start_index = raw_text.find('{')
         end_index = raw_text.rfind('}')
         if start_index != -1 and end_index != -1 and end_index > start_index:
             json_string = raw_text[start_index : end_index + 1]
-            new_findings = json.loads(json_string)
-            socketio.emit('update_log', {'data': f'🧠 **AI 學徒探索完成，共提交 {len(new_findings)} 項新發現供導師審查。**'})
+            return json.loads(json_string)
         else:
             raise ValueError("AI 學徒回傳的內容中找不到有效的 JSON 物件。")
     except Exception as e:
-        socketio.emit('update_log', {'data': f'❌ **錯誤：AI 學徒回傳的 JSON 格式解析失敗。**\n<pre>錯誤細節: {e}</pre>'})
+        socketio.emit('update_log', {'data': f'⚠️ **區塊「{region_name}」分析失敗，略過此區塊。**\n<pre>錯誤細節: {e}</pre>'})
+        return {}
+
+def _merge_findings(partial_findings: List[dict]) -> dict:
+    """合併各區塊的發現：同名意圖的選擇器合併，並移除重複的選擇器 (以先出現者為準)。"""
+    merged = {}
+    seen_selectors = set()
+    for findings in partial_findings:
+        for intent, selectors in findings.items():
+            if isinstance(selectors, str):
+                selectors = [selectors]
+            if not isinstance(selectors, list):
+                continue
+            for selector in selectors:
+                if not isinstance(selector, str) or not selector.strip() or selector in seen_selectors:
+                    continue
+                seen_selectors.add(selector)
+                merged.setdefault(intent, []).append(selector)
+    return merged
+
+def _analyze_and_update(socketio, file_path: str):
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            full_page_html = f.read()
+    except Exception as e:
+        socketio.emit('update_log', {'data': f'❌ **錯誤：無法讀取已儲存的頁面快照檔案：** {e}'})
+        return 0
+
+    regions = _split_page_into_regions(full_page_html)
+    if not regions:
+        socketio.emit('update_log', {'data': '🤔 **頁面中找不到可分析的區塊。**'})
+        return 0
+
+    # 各區塊以有上限的執行緒池平行分析，學習時間取決於最慢的區塊而非整頁
+    socketio.emit('update_log', {'data': f'🤖 **AI 學徒啟動：頁面已切分為 {len(regions)} 個區塊，正在平行分析穩定元素特徵...**'})
+    with ThreadPoolExecutor(max_workers=min(_MAX_ANALYSIS_WORKERS, len(regions))) as executor:
+        partial_findings = list(executor.map(lambda region: _analyze_region(socketio, *region), regions))
+
+    new_findings = _merge_findings(partial_findings)
+    if not new_findings:
+        socketio.emit('update_log', {'data': '❌ **錯誤：AI 學徒未能從任何區塊中提交有效發現。**'})
         return 0
+    socketio.emit('update_log', {'data': f'🧠 **AI 學徒探索完成，共提交 {len(new_findings)} 項新發現供導師審查。**'})
 
     final_knowledge_to_add = _consolidate_knowledge(socketio, new_findings)
 
@@ -117,6 +303,7 @@ def build_knowledge_from_url(socketio, url: str):
         socketio.emit('update_log', {'data': f'🚀 **開始擴充知識庫，目標網址：** {url}'})
         
         socketio.emit('update_log', {'data': '🔗 正在啟動瀏覽器並前往目標網址...'})
+        browser_tools.open_tab()
         nav_result = browser_tools.navigate_to_url(url)
         if "失敗" in nav_result:
             socketio.emit('update_log', {'data': f'❌ **錯誤：** 無法導航至 {url}。 {nav_result}'})
@@ -136,9 +323,7 @@ def build_knowledge_from_url(socketio, url: str):
     except Exception as e:
         socketio.emit('update_log', {'data': f'❌ **擴充知識庫時發生嚴重錯誤：** {e}'})
     finally:
-        if browser_tools.driver:
-            browser_tools.driver.quit()
-            browser_tools.driver = None
+        browser_tools.close_tab()
         socketio.emit('task_complete', {'data': '✨ **知識庫擴充流程結束。**'})
 
 def learn_from_current_page(socketio):
@@ -0,0 +1,263 @@
+# agent/knowledge_maintenance.py (離線選擇器重新驗證與修剪)
+#
+# 使用方式 (於專案根目錄執行)：
+#   python -m agent.knowledge_maintenance            # 只產生報告 (dry-run)
+#   python -m agent.knowledge_maintenance --apply    # 實際修剪 / 降級知識庫
+
+import argparse
+import os
+import warnings
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+from soupsieve import SelectorSyntaxError
+
+from . import knowledge_base
+
+# 每種頁面只以最近的幾份快照判斷選擇器「現在」是否仍然有效，更早的快照用來判斷它「曾經」有效
+DEFAULT_CAPTURES_PER_PAGE = 3
+# 在仍有命中的頁面類型中，最近快照的命中率低於此值的選擇器視為「過時」並降級
+DEFAULT_MIN_HIT_RATE = 0.5
+# 平均命中元素數量超過此值的選擇器視為「模糊」並降級
+DEFAULT_MAX_MATCHES = 20
+
+
+def _get_captures_dir() -> str:
+    """輔助函式：取得 page_captures 資料夾的絕對路徑 (與 browser_tools.save_full_page_content 一致)"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, 'page_captures')
+
+
+def _collect_captures() -> List[Tuple[str, str, str]]:
+    """
+    掃描 page_captures，回傳所有快照的 (網域, 時間戳記, 路徑)，依時間由舊到新排序。
+    檔名格式為 `{hostname}_{YYYYmmdd}_{HHMMSS}.html`。
+    """
+    captures_dir = _get_captures_dir()
+    if not os.path.isdir(captures_dir):
+        return []
+
+    captures = []
+    for filename in os.listdir(captures_dir):
+        if not filename.endswith('.html'):
+            continue
+        parts = filename[:-len('.html')].rsplit('_', 2)
+        if len(parts) != 3:
+            continue
+        hostname, date_part, time_part = parts
+        captures.append((hostname, f"{date_part}_{time_part}", os.path.join(captures_dir, filename)))
+    return sorted(captures, key=lambda capture: capture[1])
+
+
+def _page_type(soup, hostname: str) -> str:
+    """
+    依據快照中的 canonical / og:url 網址判斷頁面類型 (網域 + 第一層路徑，例如 `24h.pchome.com.tw/search`)。
+    同一網域的首頁與搜尋結果頁結構完全不同，必須分開比較。
+    """
+    page_url = ''
+    canonical = soup.find('link', rel='canonical')
+    if canonical and canonical.get('href'):
+        page_url = canonical['href']
+    else:
+        og_url = soup.find('meta', property='og:url')
+        if og_url and og_url.get('content'):
+            page_url = og_url['content']
+
+    first_segment = urlparse(page_url).path.strip('/').split('/')[0]
+    return f"{hostname}/{first_segment}"
+
+
+def _count_matches_in_capture(file_path: str, hostname: str, selectors: List[str]) -> Tuple[str, Optional[str], Dict[str, Optional[int]]]:
+    """
+    【Process Pool 工作函式】以本地 HTML 解析器與 CSS 引擎 (BeautifulSoup + soupsieve) 解析單一快照，
+    回傳頁面類型與每個選擇器命中的元素數量。本地 CSS 引擎無法解析的選擇器記為 None。
+    """
+    counts: Dict[str, Optional[int]] = {}
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+    except Exception as e:
+        print(f"無法讀取頁面快照 '{file_path}': {e}")
+        return file_path, None, counts
+
+    with warnings.catch_warnings():
+        # soupsieve 對 `:contains` 等已棄用的寫法會發出 FutureWarning，不應混入報告輸出
+        warnings.simplefilter('ignore', FutureWarning)
+        for selector in selectors:
+            try:
+                counts[selector] = len(soup.select(selector))
+            except (SelectorSyntaxError, NotImplementedError, ValueError):
+                counts[selector] = None
+    return file_path, _page_type(soup, hostname), counts
+
+
+def _score_selector(per_page: Dict[str, List[Tuple[str, Optional[int]]]], captures_per_page: int,
+                    min_hit_rate: float, max_matches: int) -> dict:
+    """
+    依據各頁面類型的快照命中數量 (由舊到新) 為單一選擇器評分。
+    - 只有「曾經命中過」的頁面類型才與這個選擇器相關；在所有快照中都沒有命中的選擇器狀態為 unknown (可能屬於尚未擷取過的頁面)。
+    - 在相關頁面類型中，若較舊的快照命中、但最近 N 份快照全部不再命中，該頁面類型判定為失效。
+      所有相關頁面類型都失效時，狀態為 dead。
+    - hit_rate: 相關頁面類型中，最近 N 份快照仍命中的比例 (越高越新鮮)
+    - uniqueness: 1 / 平均命中元素數 (1.0 代表每次都唯一命中)
+    - score: hit_rate * uniqueness
+    """
+    result = {'status': 'unknown', 'score': None, 'hit_rate': None, 'uniqueness': None,
+              'pages': [], 'last_matched': None}
+
+    if any(count is None for samples in per_page.values() for _, count in samples):
+        result['status'] = 'unsupported'
+        return result
+
+    matched_pages = {page: samples for page, samples in per_page.items() if any(count for _, count in samples)}
+    if not matched_pages:
+        return result
+
+    result['pages'] = sorted(matched_pages)
+    result['last_matched'] = max(timestamp for samples in matched_pages.values() for timestamp, count in samples if count)
+
+    recent = [count for samples in matched_pages.values() for _, count in samples[-captures_per_page:]]
+    hits = [count for count in recent if count > 0]
+    if not hits:
+        # 每個相關頁面類型都是「舊快照命中、最近快照全部落空」
+        result.update({'status': 'dead', 'score': 0.0, 'hit_rate': 0.0, 'uniqueness': 0.0})
+        return result
+
+    hit_rate = len(hits) / len(recent)
+    average_matches = sum(hits) / len(hits)
+    uniqueness = 1.0 / average_matches
+
+    if average_matches > max_matches:
+        status = 'ambiguous'
+    elif hit_rate < min_hit_rate:
+        status = 'stale'
+    else:
+        status = 'healthy'
+
+    result.update({
+        'status': status,
+        'score': round(hit_rate * uniqueness, 4),
+        'hit_rate': round(hit_rate, 4),
+        'uniqueness': round(uniqueness, 4),
+    })
+    return result
+
+
+def revalidate_knowledge_base(dry_run: bool = True,
+                              captures_per_page: int = DEFAULT_CAPTURES_PER_PAGE,
+                              min_hit_rate: float = DEFAULT_MIN_HIT_RATE,
+                              max_matches: int = DEFAULT_MAX_MATCHES,
+                              max_workers: Optional[int] = None) -> dict:
+    """
+    【維護工作】以頁面快照離線重新驗證知識庫中所有 (意圖, 選擇器) 組合。
+    1. 以 Process Pool 平行解析每份快照，判斷其頁面類型並計算每個選擇器的命中數。
+    2. 為每個選擇器評分：dead (曾命中的頁面在最近快照中不再命中) / stale (命中率過低) /
+       ambiguous (命中過多元素) / healthy / unknown (沒有任何快照可判斷)。
+    3. dead 的選擇器會被修剪；stale 與 ambiguous 的選擇器會被降級至列表末端。
+       若某意圖的所有選擇器都是 dead，保留最近仍命中過的那一個並改為降級，不會刪除整個意圖。
+    4. dry_run=True 時只回傳報告，不會修改 knowledge_base.json。
+    本地 CSS 引擎無法解析的選擇器 (unsupported) 與 unknown 的選擇器一律保留。
+    """
+    kb = {intent: knowledge_base.get_selectors(intent) for intent in knowledge_base.get_all_intents()}
+    captures = _collect_captures()
+    report = {'dry_run': dry_run, 'pages': {}, 'intents': {}, 'pruned': {}, 'demoted': {}, 'changed': 0}
+
+    if not kb or not captures:
+        print("知識庫或頁面快照為空，沒有可重新驗證的項目。")
+        return report
+
+    all_selectors = sorted({selector for selectors in kb.values() for selector in selectors})
+    timestamp_of = {path: timestamp for _, timestamp, path in captures}
+
+    # selector -> 頁面類型 -> [(時間戳記, 命中數)]，依時間由舊到新
+    matches = defaultdict(lambda: defaultdict(list))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_count_matches_in_capture, path, hostname, all_selectors)
+                   for hostname, _, path in captures]
+        for future in futures:
+            file_path, page_type, counts = future.result()
+            if page_type is None:
+                continue
+            report['pages'].setdefault(page_type, []).append(file_path)
+            for selector, count in counts.items():
+                matches[selector][page_type].append((timestamp_of[file_path], count))
+
+    scores = {selector: _score_selector(matches[selector], captures_per_page, min_hit_rate, max_matches)
+              for selector in all_selectors}
+
+    for intent, selectors in kb.items():
+        report['intents'][intent] = {selector: scores[selector] for selector in selectors}
+        dead = [s for s in selectors if scores[s]['status'] == 'dead']
+        weak = [s for s in selectors if scores[s]['status'] in ('stale', 'ambiguous')]
+        if dead and len(dead) == len(selectors):
+            keep = max(dead, key=lambda s: scores[s]['last_matched'])
+            dead.remove(keep)
+            weak.append(keep)
+        if dead:
+            report['pruned'][intent] = dead
+        if weak:
+            report['demoted'][intent] = weak
+
+    if not dry_run:
+        report['changed'] = knowledge_base.apply_selector_changes(report['pruned'], report['demoted'])
+
+    return report
+
+
+def format_report(report: dict) -> str:
+    """將 revalidate_knowledge_base 的結果整理成人類可讀的文字報告。"""
+    total_captures = sum(len(paths) for paths in report['pages'].values())
+    status_counts = defaultdict(int)
+    for selectors in report['intents'].values():
+        for result in selectors.values():
+            status_counts[result['status']] += 1
+
+    lines = [
+        f"🧹 知識庫重新驗證報告 ({'dry-run，未寫入' if report['dry_run'] else '已套用'})",
+        f"   快照: {total_captures} 份 / 頁面類型: "
+        + (', '.join(f"{page} ({len(paths)})" for page, paths in sorted(report['pages'].items())) or '無'),
+        "   狀態統計: " + ", ".join(f"{status}={count}" for status, count in sorted(status_counts.items())),
+    ]
+
+    for intent, selectors in report['pruned'].items():
+        for selector in selectors:
+            result = report['intents'][intent][selector]
+            lines.append(f"   ✂️ 修剪 [{intent}] -> `{selector}` (最後命中: {result['last_matched']})")
+    for intent, selectors in report['demoted'].items():
+        for selector in selectors:
+            result = report['intents'][intent][selector]
+            lines.append(
+                f"   ⬇️ 降級 [{intent}] -> `{selector}` "
+                f"({result['status']}, hit_rate={result['hit_rate']}, uniqueness={result['uniqueness']})"
+            )
+
+    if not report['dry_run']:
+        lines.append(f"   ✅ 共變動 {report['changed']} 個選擇器。")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以頁面快照離線重新驗證並修剪 knowledge_base.json 中的選擇器。")
+    parser.add_argument('--apply', action='store_true', help="實際寫入修剪 / 降級結果 (預設只產生 dry-run 報告)")
+    parser.add_argument('--captures-per-page', type=int, default=DEFAULT_CAPTURES_PER_PAGE,
+                        help="每種頁面類型用來判斷「目前是否有效」的最近快照數量")
+    parser.add_argument('--min-hit-rate', type=float, default=DEFAULT_MIN_HIT_RATE)
+    parser.add_argument('--max-matches', type=int, default=DEFAULT_MAX_MATCHES)
+    parser.add_argument('--workers', type=int, default=None, help="Process Pool 的工作行程數 (預設為 CPU 核心數)")
+    args = parser.parse_args()
+
+    report = revalidate_knowledge_base(
+        dry_run=not args.apply,
+        captures_per_page=args.captures_per_page,
+        min_hit_rate=args.min_hit_rate,
+        max_matches=args.max_matches,
+        max_workers=args.workers,
+    )
+    print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,16 +3,59 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+import socket
+import threading
+import time
 from flask import Flask, render_template
 from flask_socketio import SocketIO
 from dotenv import load_dotenv
-from agent.agent_core import run_agent_task
-from agent.knowledge_builder import build_knowledge_from_url
 
 load_dotenv()
 app = Flask(__name__)
 socketio = SocketIO(app, async_mode='threading')
 
+# --- vvv 延遲載入 agent 模組 vvv ---
+# agent 會匯入 google.generativeai、Selenium 與 webdriver_manager，匯入時間遠大於 Flask 本身。
+# 伺服器啟動時不再於模組層級匯入，改為首次使用時 (或伺服器開始接受連線後由背景執行緒預載) 才匯入。
+_agent_lock = threading.Lock()
+_agent_modules = None
+_configured_api_key = None
+
+def _load_agent():
+    """輔助函式：匯入並快取 (agent_core, knowledge_builder)，多個請求同時呼叫時只會匯入一次。"""
+    global _agent_modules
+    with _agent_lock:
+        if _agent_modules is None:
+            from agent import agent_core, knowledge_builder
+            _agent_modules = (agent_core, knowledge_builder)
+        return _agent_modules
+
+def preload_agent_when_listening(port: int, host: str = '127.0.0.1', timeout: float = 30.0):
+    """
+    在背景等待伺服器開始接受連線後才預載 agent 模組，避免匯入與伺服器啟動爭搶 GIL 與匯入鎖。
+    逾時仍未偵測到伺服器時照常預載。
+    """
+    def wait_then_load():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection((host, port), timeout=0.2):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        _load_agent()
+    socketio.start_background_task(wait_then_load)
+
+def _configure_genai(api_key: str):
+    """輔助函式：只在 API Key 變更時才重新設定 genai，避免每個請求都重複設定。"""
+    global _configured_api_key
+    with _agent_lock:
+        if _configured_api_key != api_key:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+# --- ^^^ 延遲載入結束 ^^^ ---
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -36,8 +79,9 @@ def handle_task(json_data):
     if user_task:
         api_key = get_api_key()
         if api_key:
+            agent_core, _ = _load_agent()
             # 呼叫 run_agent_task 時不再傳遞 user_url
-            socketio.start_background_task(run_agent_task, socketio, api_key, user_task)
+            socketio.start_background_task(agent_core.run_agent_task, socketio, api_key, user_task)
     else:
         print("[偵錯] 錯誤：任務內容為空。")
 
@@ -51,12 +95,16 @@ def handle_knowledge_expansion(json_data):
     if url:
         api_key = get_api_key()
         if api_key:
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            socketio.start_background_task(build_knowledge_from_url, socketio, url)
+            _, knowledge_builder = _load_agent()
+            _configure_genai(api_key)
+            socketio.start_background_task(knowledge_builder.build_knowledge_from_url, socketio, url)
     else:
         print("[偵錯] 錯誤：學習網址為空。")
 
 if __name__ == '__main__':
-    print("伺服器啟動於 http://127.0.0.1:5000")
-    socketio.run(app, debug=True)
\ No newline at end of file
+    # debug 模式下 werkzeug reloader 的父行程只負責監看檔案，只在實際服務請求的子行程中預載 agent
+    port = 5000
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        preload_agent_when_listening(port)
+    print(f"伺服器啟動於 http://127.0.0.1:{port}")
+    socketio.run(app, port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,123 @@
+# tools/startup_benchmark.py (啟動時間分析與基準測試)
+#
+# 使用方式 (於專案根目錄執行)：
+#   python tools/startup_benchmark.py                 # 匯入時間報告 + 啟動基準測試
+#   python tools/startup_benchmark.py --runs 10 --top 25
+#
+# 1. 匯入時間報告：以 `python -X importtime -c "import app"` 分析啟動路徑上最耗時的模組。
+# 2. 啟動基準測試：量測從行程啟動到伺服器可接受 TCP 連線所需的時間，
+#    lazy 模式與 app.py 相同 (伺服器開始接受連線後才預載)，並與「啟動時立即匯入 agent 模組」的舊行為 (eager) 比較。
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 以 debug=False 啟動，避免 werkzeug reloader 額外產生一個行程干擾量測
+_SERVER_SNIPPET = (
+    "import app\n"
+    "{preload}\n"
+    "app.socketio.run(app.app, port={port}, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)\n"
+)
+_LAZY_PRELOAD = "app.preload_agent_when_listening({port})"
+_EAGER_PRELOAD = "app._load_agent()"
+
+
+def profile_imports(top: int) -> str:
+    """執行 `-X importtime` 並回傳依累計時間排序的匯入時間報告。"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+
+    if result.returncode != 0:
+        stderr_lines = result.stderr.strip().splitlines()
+        detail = stderr_lines[-1] if stderr_lines else '(沒有錯誤輸出)'
+        return f"❌ 匯入 app 失敗 (return code {result.returncode})：\n{detail}"
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        entries.append((int(cumulative_us), int(self_us), name))
+
+    if not entries:
+        return "❌ 無法取得匯入時間資料。"
+
+    app_entry = next((entry for entry in entries if entry[2] == 'app'), None)
+    lines = ["📦 啟動路徑匯入時間報告 (import app)"]
+    if app_entry:
+        lines.append(f"   總計: {app_entry[0] / 1000:.1f} ms")
+    lines.append(f"   {'cumulative(ms)':>14} {'self(ms)':>9}  module")
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:top]:
+        lines.append(f"   {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_time_to_listen(preload: str, timeout: float = 60.0) -> float:
+    """啟動伺服器並輪詢連接埠，回傳從行程啟動到可接受連線的秒數。"""
+    port = _free_port()
+    code = _SERVER_SNIPPET.format(preload=preload.format(port=port), port=port)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"伺服器行程提早結束 (return code {process.returncode})。")
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"伺服器在 {timeout} 秒內未開始接受連線。")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def benchmark_startup(runs: int) -> str:
+    """分別以延遲載入 (lazy) 與立即載入 (eager) 模式啟動伺服器多次，回傳比較報告。"""
+    lines = [f"⏱️ 啟動基準測試 (行程啟動 -> 接受連線，{runs} 次)"]
+    medians = {}
+    for label, preload in (('lazy', _LAZY_PRELOAD), ('eager', _EAGER_PRELOAD)):
+        samples = [measure_time_to_listen(preload) for _ in range(runs)]
+        medians[label] = statistics.median(samples)
+        lines.append(
+            f"   {label:>5}: median {medians[label] * 1000:.0f} ms "
+            f"(min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms)"
+        )
+    if medians['eager'] > 0:
+        lines.append(f"   lazy / eager = {medians['lazy'] / medians['eager']:.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分析 app.py 的啟動匯入時間並量測伺服器開始接受連線所需的時間。")
+    parser.add_argument('--runs', type=int, default=5, help="每種模式的啟動次數")
+    parser.add_argument('--top', type=int, default=20, help="匯入時間報告列出的模組數量")
+    parser.add_argument('--skip-benchmark', action='store_true', help="只產生匯入時間報告")
+    args = parser.parse_args()
+
+    print(profile_imports(args.top))
+    if not args.skip_benchmark:
+        print()
+        print(benchmark_startup(args.runs))
+
+
+if __name__ == '__main__':
+    main()